@@ -1,11 +1,15 @@
 import streamlit as st
-import requests
-import pandas as pd
-import json
-from datetime import datetime
+import httpx
+import asyncio
+import ijson
+import orjson
 import time
 import os
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import functools
+from concurrent.futures import ThreadPoolExecutor
 
 # Set page configuration
 st.set_page_config(
@@ -14,8 +18,67 @@ st.set_page_config(
     layout="centered"
 )
 
+# Retry rate-limited and failed Petfinder GETs with jittered exponential backoff,
+# honouring Retry-After. httpx's own retries only cover connection errors.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.3
+_RETRY_AFTER_MAX = 10.0  # Seconds; keeps a long Retry-After from hanging the page
+
+# Function to pick the wait before retrying a response
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), _RETRY_AFTER_MAX) + random.uniform(0, _RETRY_BACKOFF)
+    return _RETRY_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+
+class _RetryTransport(httpx.HTTPTransport):
+    def handle_request(self, request):
+        if request.method == "GET":
+            for attempt in range(_RETRY_TOTAL):
+                response = super().handle_request(request)
+                if response.status_code not in _RETRY_STATUSES:
+                    return response
+                delay = _retry_delay(response, attempt)
+                response.close()
+                time.sleep(delay)
+        return super().handle_request(request)
+
+class _AsyncRetryTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request):
+        if request.method == "GET":
+            for attempt in range(_RETRY_TOTAL):
+                response = await super().handle_async_request(request)
+                if response.status_code not in _RETRY_STATUSES:
+                    return response
+                delay = _retry_delay(response, attempt)
+                await response.aclose()
+                await asyncio.sleep(delay)
+        return await super().handle_async_request(request)
+
+# Shared HTTP/2 client for Petfinder API calls
+@st.cache_resource(show_spinner=False)
+def get_http_client():
+    limits = httpx.Limits(max_keepalive_connections=10, max_connections=20)
+    transport = _RetryTransport(http2=True, limits=limits, retries=3)
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(10.0),
+        headers={"User-Agent": "PetMatch/1.0"}
+    )
+
+_client = get_http_client()
+
 # Custom CSS
-st.markdown("""
+_CSS_HTML = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -55,13 +118,30 @@ st.markdown("""
         font-size: 0.8rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Static About tab text
+_ABOUT_MD = """
+PetMatch helps you find your perfect pet companion from thousands of adoptable animals across the country.
+
+**How to use PetMatch:**
+1. Search for pets based on your preferences and location
+2. Browse through the results and click "View Details" to learn more about each pet
+3. Add pets to your favorites to keep track of the ones you're interested in
+4. Contact the shelter or rescue organization directly using the provided information
+
+**Data Source:**
+PetMatch uses the Petfinder API to provide up-to-date information on adoptable pets. Petfinder is North America's largest adoption website with hundreds of thousands of adoptable pets listed by more than 11,500 animal shelters and rescue organizations.
+
+**Privacy:**
+PetMatch does not store any personal information or search history. Your favorites are stored locally in your browser and are not shared with any third parties.
+"""
 
 # Initialize session state variables
 if 'access_token' not in st.session_state:
     st.session_state.access_token = None
-if 'token_expires' not in st.session_state:
-    st.session_state.token_expires = 0
+if 'token_deadline' not in st.session_state:
+    st.session_state.token_deadline = 0.0  # time.monotonic() deadline
 if 'search_results' not in st.session_state:
     st.session_state.search_results = None
 if 'selected_pet' not in st.session_state:
@@ -69,13 +149,26 @@ if 'selected_pet' not in st.session_state:
 if 'page' not in st.session_state:
     st.session_state.page = 1
 if 'favorites' not in st.session_state:
-    st.session_state.favorites = []
+    st.session_state.favorites = []  # Pet IDs, in the order they were added
+if 'favorite_ids' not in st.session_state:
+    st.session_state.favorite_ids = set()
+if 'prefetched_page' not in st.session_state:
+    st.session_state.prefetched_page = None
+
+# Access token for the current script run; session_state carries it across reruns
+_token = None
+_token_deadline = 0.0
 
 # Function to get access token
 def get_access_token():
+    global _token, _token_deadline
+    
     # Check if token is still valid
-    if st.session_state.access_token and time.time() < st.session_state.token_expires:
-        return st.session_state.access_token
+    if _token and time.monotonic() < _token_deadline:
+        return _token
+    if st.session_state.access_token and time.monotonic() < st.session_state.token_deadline:
+        _token, _token_deadline = st.session_state.access_token, st.session_state.token_deadline
+        return _token
     
     # Get API credentials from environment variables or secrets
     api_key = os.environ.get('PETFINDER_API_KEY') or st.secrets.get('PETFINDER_API_KEY')
@@ -94,16 +187,73 @@ def get_access_token():
     }
     
     try:
-        response = requests.post(url, data=data)
+        response = _client.post(url, data=data)
         response.raise_for_status()
-        token_data = response.json()
-        st.session_state.access_token = token_data['access_token']
-        st.session_state.token_expires = time.time() + token_data['expires_in'] - 60  # Buffer of 60 seconds
-        return st.session_state.access_token
-    except requests.exceptions.RequestException as e:
+        token_data = orjson.loads(response.content)
+        _token = token_data['access_token']
+        _token_deadline = time.monotonic() + token_data['expires_in'] - 60  # Buffer of 60 seconds
+        st.session_state.access_token = _token
+        st.session_state.token_deadline = _token_deadline
+        return _token
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
         st.error(f"⚠️ Error getting access token: {str(e)}")
         return None
 
+# Fields of a Petfinder animal that the cards and details page render
+_PET_FIELDS = (
+    'id', 'name', 'type', 'status', 'age', 'gender', 'size', 'breeds', 'colors', 'environment',
+    'attributes', 'description', 'photos', 'contact', 'organization_id', 'url', 'location'
+)
+
+# Function to drop the parts of a pet record the app never shows and
+# precompute the display strings shared by the card and details page
+def _normalize_pet(pet):
+    slim = {key: pet[key] for key in _PET_FIELDS if key in pet}
+    if slim.get('photos'):
+        slim['photos'] = [{'medium': photo.get('medium'), 'large': photo.get('large')} for photo in slim['photos']]
+    
+    breeds = slim.get('breeds') or {}
+    breed_text = breeds.get('primary') or ""
+    if breed_text:
+        if breeds.get('secondary'):
+            breed_text += f" & {breeds['secondary']}"
+        if breeds.get('mixed'):
+            breed_text += " (Mixed)"
+    slim['_breed_text'] = breed_text
+    
+    colors = slim.get('colors') or {}
+    slim['_colors'] = ', '.join(filter(None, [colors.get('primary'), colors.get('secondary'), colors.get('tertiary')]))
+    return slim
+
+# Function to turn streamed response chunks into ijson parse events
+def _iter_events(chunks):
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events, use_float=True)
+    for chunk in chunks:
+        parser.send(chunk)
+        yield from events
+        del events[:]
+    parser.close()
+    yield from events
+
+# Function to parse a streamed search response one animal at a time
+def _parse_search_response(events):
+    animals = []
+    pagination = {}
+    builder = None
+    for prefix, event, value in events:
+        if builder is None and event == 'start_map' and prefix in ('animals.item', 'pagination'):
+            builder, root = ijson.ObjectBuilder(), prefix
+        if builder is not None:
+            builder.event(event, value)
+            if event == 'end_map' and prefix == root:
+                if root == 'pagination':
+                    pagination = builder.value
+                else:
+                    animals.append(_normalize_pet(builder.value))
+                builder = None
+    return {'animals': animals, 'pagination': pagination}
+
 # Function to search pets
 def search_pets(params):
     token = get_access_token()
@@ -114,29 +264,98 @@ def search_pets(params):
     headers = {"Authorization": f"Bearer {token}"}
     
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        with _client.stream("GET", url, headers=headers, params=params) as response:
+            response.raise_for_status()
+            return _parse_search_response(_iter_events(response.iter_bytes()))
+    except (httpx.HTTPError, ijson.JSONError) as e:
         st.error(f"⚠️ Error searching pets: {str(e)}")
         return None
 
 
 
+# Functions to fetch further result pages concurrently
+async def _search_page(client, params, page):
+    animals = []
+    parsed = ijson.sendable_list()
+    parser = ijson.items_coro(parsed, 'animals.item', use_float=True)
+    async with client.stream("GET", "https://api.petfinder.com/v2/animals", params={**params, "page": page}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            parser.send(chunk)
+            animals.extend(_normalize_pet(pet) for pet in parsed)
+            del parsed[:]
+    parser.close()
+    animals.extend(_normalize_pet(pet) for pet in parsed)
+    return animals
+
+async def _search_pages(token, params, pages):
+    headers = {"Authorization": f"Bearer {token}", "User-Agent": _client.headers["User-Agent"]}
+    transport = _AsyncRetryTransport(http2=True, limits=httpx.Limits(max_connections=10), retries=3)
+    async with httpx.AsyncClient(transport=transport, headers=headers, timeout=httpx.Timeout(30.0)) as client:
+        return await asyncio.gather(*[_search_page(client, params, page) for page in pages])
+
+# Function to search pets across several result pages
+def search_pets_all(params, max_pages=5):
+    results = search_pets(params)
+    if not results or 'animals' not in results:
+        return results
+    
+    total_pages = results.get('pagination', {}).get('total_pages', 1)
+    pages = range(2, min(total_pages, max_pages) + 1)
+    if not pages:
+        return results
+    
+    try:
+        # Listings can shift between page requests, so skip pets already shown
+        seen = {pet['id'] for pet in results['animals']}
+        for animals in asyncio.run(_search_pages(get_access_token(), params, pages)):
+            for pet in animals:
+                if pet['id'] not in seen:
+                    seen.add(pet['id'])
+                    results['animals'].append(pet)
+    except (httpx.HTTPError, ijson.JSONError) as e:
+        st.warning(f"⚠️ Showing only the first page of results: {str(e)}")
+    return results
+
+# Cached API fetches. Errors propagate so failed requests are not cached.
+# The leading underscore keeps _access_token out of the cache key.
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_breeds(animal_type, _access_token):
+    url = f"https://api.petfinder.com/v2/types/{animal_type}/breeds"
+    headers = {"Authorization": f"Bearer {_access_token}"}
+    response = _client.get(url, headers=headers)
+    response.raise_for_status()
+    return [breed['name'] for breed in orjson.loads(response.content)['breeds']]
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_organizations(location, _access_token):
+    url = "https://api.petfinder.com/v2/organizations"
+    headers = {"Authorization": f"Bearer {_access_token}"}
+    params = {"location": location, "distance": 100, "limit": 100}
+    response = _client.get(url, headers=headers, params=params)
+    response.raise_for_status()
+    return [(org['id'], org['name']) for org in orjson.loads(response.content)['organizations']]
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_pet_details(pet_id, _access_token):
+    url = f"https://api.petfinder.com/v2/animals/{pet_id}"
+    headers = {"Authorization": f"Bearer {_access_token}"}
+    with _client.stream("GET", url, headers=headers) as response:
+        response.raise_for_status()
+        animal = next(ijson.items(_iter_events(response.iter_bytes()), 'animal'), None)
+    if animal is None:
+        raise ijson.JSONError(f"Response for pet {pet_id} has no animal record")
+    return _normalize_pet(animal)
+
 # Function to get breeds
 def get_breeds(animal_type):
     token = get_access_token()
     if not token:
         return []
     
-    url = f"https://api.petfinder.com/v2/types/{animal_type}/breeds"
-    headers = {"Authorization": f"Bearer {token}"}
-    
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return [breed['name'] for breed in response.json()['breeds']]
-    except requests.exceptions.RequestException as e:
+        return _fetch_breeds(animal_type, token)
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
         st.error(f"⚠️ Error getting breeds: {str(e)}")
         return []
 
@@ -146,15 +365,9 @@ def get_organizations(location):
     if not token:
         return []
     
-    url = "https://api.petfinder.com/v2/organizations"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"location": location, "distance": 100, "limit": 100}
-    
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return [(org['id'], org['name']) for org in response.json()['organizations']]
-    except requests.exceptions.RequestException as e:
+        return _fetch_organizations(location, token)
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
         st.error(f"⚠️ Error getting organizations: {str(e)}")
         return []
 
@@ -164,140 +377,101 @@ def get_pet_details(pet_id):
     if not token:
         return None
     
-    url = f"https://api.petfinder.com/v2/animals/{pet_id}"
-    headers = {"Authorization": f"Bearer {token}"}
-    
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()['animal']
-    except requests.exceptions.RequestException as e:
+        return _fetch_pet_details(pet_id, token)
+    except (httpx.HTTPError, ijson.JSONError) as e:
         st.error(f"⚠️ Error getting pet details: {str(e)}")
         return None
 
-# Function to format pet card
-def display_pet_card(pet, is_favorite=False, context="search"):
-    col1, col2 = st.columns([1, 2])
+# Function to warm the pet details cache for several pets in parallel.
+# Returns one entry per ID: the pet, None if Petfinder no longer has it,
+# or the exception raised while fetching it.
+def prefetch_pet_details(pet_ids):
+    token = get_access_token()
+    if not token:
+        return []
     
-    with col1:
-        if pet['photos'] and len(pet['photos']) > 0:
-            st.image(pet['photos'][0]['medium'], use_container_width=True)
-        else:
-            st.image("https://via.placeholder.com/300x300?text=No+Image", use_container_width=True)
+    def fetch(pet_id):
+        try:
+            return _fetch_pet_details(pet_id, token)
+        except httpx.HTTPStatusError as e:
+            return None if e.response.status_code == 404 else e
+        except (httpx.HTTPError, ijson.JSONError) as e:
+            return e
     
-    with col2:
-        st.markdown(f"<div class='pet-name'>{pet['name']}</div>", unsafe_allow_html=True)
-        
-        # Tags
-        tags_html = ""
-        if pet['status'] == 'adoptable':
-            tags_html += "<span class='tag' style='background-color: #808080;'>Adoptable</span> "
-        else:
-            tags_html += f"<span class='tag' style='background-color: #808080;'>{pet['status'].title()}</span> "
-        
-        if pet['age']:
-            tags_html += f"<span class='tag'>{pet['age']}</span> "
-        if pet['gender']:
-            tags_html += f"<span class='tag'>{pet['gender']}</span> "
-        if pet['size']:
-            tags_html += f"<span class='tag'>{pet['size']}</span> "
-        
-        st.markdown(f"<div>{tags_html}</div>", unsafe_allow_html=True)
-        
-        st.markdown("<div class='pet-details'>", unsafe_allow_html=True)
-        if pet['breeds']['primary']:
-            breed_text = pet['breeds']['primary']
-            if pet['breeds']['secondary']:
-                breed_text += f" & {pet['breeds']['secondary']}"
-            if pet['breeds']['mixed']:
-                breed_text += " (Mixed)"
-            st.markdown(f"<strong>Breed:</strong> {breed_text}", unsafe_allow_html=True)
-        
-        if pet['colors']['primary'] or pet['colors']['secondary'] or pet['colors']['tertiary']:
-            colors = [c for c in [pet['colors']['primary'], pet['colors']['secondary'], pet['colors']['tertiary']] if c]
-            st.markdown(f"<strong>Colors:</strong> {', '.join(colors)}", unsafe_allow_html=True)
-        
-        if 'location' in pet and pet['contact']['address']['city'] and pet['contact']['address']['state']:
-            st.markdown(f"<strong>Location:</strong> {pet['contact']['address']['city']}, {pet['contact']['address']['state']}", unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        if pet['description']:
-            st.markdown(f"<div class='pet-description'>{pet['description'][:500]}{'...' if len(pet['description']) > 500 else ''}</div>", unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("View Details", key=f"details_{context}_{pet['id']}"):
-                st.session_state.selected_pet = pet['id']
-                st.rerun()
-        with col2:
-            if not is_favorite:
-                if st.button("Add to Favorites", key=f"fav_{context}_{pet['id']}"):
-                    if pet['id'] not in [p['id'] for p in st.session_state.favorites]:
-                        st.session_state.favorites.append(pet)
-                        st.success(f"Added {pet['name']} to favorites!")
-                        st.rerun()
-            else:
-                if st.button("Remove from Favorites", key=f"unfav_{context}_{pet['id']}"):
-                    st.session_state.favorites = [p for p in st.session_state.favorites if p['id'] != pet['id']]
-                    st.success(f"Removed {pet['name']} from favorites!")
-                    st.rerun()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(fetch, pet_ids))
 
-# Function to generate pet compatibility message
-def get_compatibility_message(pet):
+# Function to build compatibility messages from the flags that drive them
+@functools.lru_cache(maxsize=1024)
+def _compat_cached(env_children, env_dogs, env_cats, special_needs, house_trained, shots_current, spayed_neutered):
     messages = []
     
     # Check for kids
-    if 'children' in pet['environment'] and pet['environment']['children'] is not None:
-        if pet['environment']['children']:
+    if env_children is not None:
+        if env_children:
             messages.append("✅ Good with children")
         else:
             messages.append("❌ Not recommended for homes with children")
     
     # Check for dogs
-    if 'dogs' in pet['environment'] and pet['environment']['dogs'] is not None:
-        if pet['environment']['dogs']:
+    if env_dogs is not None:
+        if env_dogs:
             messages.append("✅ Good with dogs")
         else:
             messages.append("❌ Not recommended for homes with dogs")
     
     # Check for cats
-    if 'cats' in pet['environment'] and pet['environment']['cats'] is not None:
-        if pet['environment']['cats']:
+    if env_cats is not None:
+        if env_cats:
             messages.append("✅ Good with cats")
         else:
             messages.append("❌ Not recommended for homes with cats")
     
     # Handling care needs
-    if pet['attributes']:
-        if 'special_needs' in pet['attributes'] and pet['attributes']['special_needs']:
-            messages.append("⚠️ Has special needs")
-        
-        if 'house_trained' in pet['attributes'] and pet['attributes']['house_trained']:
-            messages.append("✅ House-trained")
-        elif 'house_trained' in pet['attributes']:
-            messages.append("❌ Not house-trained")
-        
-        if 'shots_current' in pet['attributes'] and pet['attributes']['shots_current']:
-            messages.append("✅ Vaccinations up to date")
-        
-        if 'spayed_neutered' in pet['attributes'] and pet['attributes']['spayed_neutered']:
-            messages.append("✅ Spayed/neutered")
+    if special_needs:
+        messages.append("⚠️ Has special needs")
+    
+    if house_trained:
+        messages.append("✅ House-trained")
+    elif house_trained is not None:
+        messages.append("❌ Not house-trained")
+    
+    if shots_current:
+        messages.append("✅ Vaccinations up to date")
+    
+    if spayed_neutered:
+        messages.append("✅ Spayed/neutered")
     
-    return messages
+    return tuple(messages)
+
+# Function to generate pet compatibility message
+def get_compatibility_message(pet):
+    environment = pet['environment'] or {}
+    attributes = pet['attributes'] or {}
+    return _compat_cached(
+        environment.get('children'),
+        environment.get('dogs'),
+        environment.get('cats'),
+        bool(attributes.get('special_needs')),
+        bool(attributes['house_trained']) if 'house_trained' in attributes else None,
+        bool(attributes.get('shots_current')),
+        bool(attributes.get('spayed_neutered')),
+    )
 
 # Function to display pet details page
 # Changes to make keys unique across different tabs
 
 # Function to display pet details page with unique tab identifier
 def display_pet_details(pet_id, context="search", tab_id="tab1"):
+    key_suffix = f"{tab_id}_{context}_{pet_id}"
     pet = get_pet_details(pet_id)
     if not pet:
         st.error("Unable to retrieve pet details. Please try again.")
         return
     
     # Back button with unique key that includes tab identifier
-    if st.button("← Back to Search Results", key=f"back_{tab_id}_{context}_{pet_id}"):
+    if st.button("← Back to Search Results", key="back_" + key_suffix):
         st.session_state.selected_pet = None
         st.rerun()  # Force immediate rerun
     
@@ -321,25 +495,16 @@ def display_pet_details(pet_id, context="search", tab_id="tab1"):
     
     with col1:
         st.markdown("### Details")
-        # Fix the breed line
-        breed_text = pet['breeds']['primary']
-        if pet['breeds']['secondary']:
-            breed_text += f" & {pet['breeds']['secondary']}"
-        if pet['breeds']['mixed']:
-            breed_text += " (Mixed)"
-    
         details = [
             f"**Type:** {pet['type']}",
-            f"**Breed:** {breed_text}",
+            f"**Breed:** {pet['_breed_text']}",
             f"**Age:** {pet['age']}",
             f"**Gender:** {pet['gender']}",
             f"**Size:** {pet['size']}"
         ]
     
-        # Fix the colors line as well, to be safe
-        colors = [c for c in [pet['colors']['primary'], pet['colors']['secondary'], pet['colors']['tertiary']] if c]
-        if colors:
-            details.append(f"**Colors:** {', '.join(colors)}")
+        if pet['_colors']:
+            details.append(f"**Colors:** {pet['_colors']}")
     
         for detail in details:
             st.markdown(detail)
@@ -381,20 +546,42 @@ def display_pet_details(pet_id, context="search", tab_id="tab1"):
         st.markdown(f"[View on Petfinder]({pet['url']})")
     
     # Add to favorites with unique key
-    is_favorite = pet['id'] in [p['id'] for p in st.session_state.favorites]
+    is_favorite = pet['id'] in st.session_state.favorite_ids
     if not is_favorite:
-        if st.button("Add to Favorites", key=f"add_fav_{tab_id}_{context}_{pet_id}"):
-            st.session_state.favorites.append(pet)
+        if st.button("Add to Favorites", key="add_fav_" + key_suffix):
+            st.session_state.favorites.append(pet['id'])
+            st.session_state.favorite_ids.add(pet['id'])
             st.success(f"Added {pet['name']} to favorites!")
             st.rerun()
     else:
-        if st.button("Remove from Favorites", key=f"rem_fav_{tab_id}_{context}_{pet_id}"):
-            st.session_state.favorites = [p for p in st.session_state.favorites if p['id'] != pet['id']]
+        if st.button("Remove from Favorites", key="rem_fav_" + key_suffix):
+            st.session_state.favorites = [pid for pid in st.session_state.favorites if pid != pet['id']]
+            st.session_state.favorite_ids.discard(pet['id'])
             st.success(f"Removed {pet['name']} from favorites!")
             st.rerun()
 
+# HTML for the text column of a pet card
+_CARD_TEMPLATE = (
+    "<div class='pet-name'>{name}</div>"
+    "<div>{tags}</div>"
+    "<div class='pet-details'>{details}</div>"
+    "{description}"
+)
+
+# Tags shown on a pet card after the status tag, in display order
+_STATUS_TAG = "<span class='tag' style='background-color: #808080;'>{}</span> "
+_TAG_FIELDS = (
+    ('age', "<span class='tag'>{}</span> "),
+    ('gender', "<span class='tag'>{}</span> "),
+    ('size', "<span class='tag'>{}</span> "),
+)
+
 # Function to format pet card with unique tab identifier
-def display_pet_card(pet, is_favorite=False, context="search", tab_id="tab1"):
+def display_pet_card(pet, is_favorite=False, context="search", tab_id="tab1", fav_ids=None):
+    if fav_ids is None:
+        fav_ids = st.session_state.favorite_ids
+    key_suffix = f"{tab_id}_{context}_{pet['id']}"
+    
     col1, col2 = st.columns([1, 2])
     
     with col1:
@@ -404,65 +591,62 @@ def display_pet_card(pet, is_favorite=False, context="search", tab_id="tab1"):
             st.image("https://via.placeholder.com/300x300?text=No+Image", use_container_width=True)
     
     with col2:
-        st.markdown(f"<div class='pet-name'>{pet['name']}</div>", unsafe_allow_html=True)
-        
         # Tags
-        tags_html = ""
-        if pet['status'] == 'adoptable':
-            tags_html += "<span class='tag' style='background-color: #808080;'>Adoptable</span> "
-        else:
-            tags_html += f"<span class='tag' style='background-color: #808080;'>{pet['status'].title()}</span> "
-        
-        if pet['age']:
-            tags_html += f"<span class='tag'>{pet['age']}</span> "
-        if pet['gender']:
-            tags_html += f"<span class='tag'>{pet['gender']}</span> "
-        if pet['size']:
-            tags_html += f"<span class='tag'>{pet['size']}</span> "
+        tags_html = _STATUS_TAG.format(pet['status'].title()) + "".join(
+            template.format(pet[field]) for field, template in _TAG_FIELDS if pet.get(field)
+        )
         
-        st.markdown(f"<div>{tags_html}</div>", unsafe_allow_html=True)
+        details_html = ""
+        if pet['_breed_text']:
+            details_html += f"<div><strong>Breed:</strong> {pet['_breed_text']}</div>"
         
-        st.markdown("<div class='pet-details'>", unsafe_allow_html=True)
-        if pet['breeds']['primary']:
-            breed_text = pet['breeds']['primary']
-            if pet['breeds']['secondary']:
-                breed_text += f" & {pet['breeds']['secondary']}"
-            if pet['breeds']['mixed']:
-                breed_text += " (Mixed)"
-            st.markdown(f"<strong>Breed:</strong> {breed_text}", unsafe_allow_html=True)
-        
-        if pet['colors']['primary'] or pet['colors']['secondary'] or pet['colors']['tertiary']:
-            colors = [c for c in [pet['colors']['primary'], pet['colors']['secondary'], pet['colors']['tertiary']] if c]
-            st.markdown(f"<strong>Colors:</strong> {', '.join(colors)}", unsafe_allow_html=True)
+        if pet['_colors']:
+            details_html += f"<div><strong>Colors:</strong> {pet['_colors']}</div>"
         
         if 'location' in pet and pet['contact']['address']['city'] and pet['contact']['address']['state']:
-            st.markdown(f"<strong>Location:</strong> {pet['contact']['address']['city']}, {pet['contact']['address']['state']}", unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
+            details_html += f"<div><strong>Location:</strong> {pet['contact']['address']['city']}, {pet['contact']['address']['state']}</div>"
         
+        description_html = ""
         if pet['description']:
-            st.markdown(f"<div class='pet-description'>{pet['description'][:300]}{'...' if len(pet['description']) > 300 else ''}</div>", unsafe_allow_html=True)
+            description_html = f"<div class='pet-description'>{pet['description'][:300]}{'...' if len(pet['description']) > 300 else ''}</div>"
+        
+        st.markdown(_CARD_TEMPLATE.format_map({
+            'name': pet['name'],
+            'tags': tags_html,
+            'details': details_html,
+            'description': description_html,
+        }), unsafe_allow_html=True)
         
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("View Details", key=f"details_{tab_id}_{context}_{pet['id']}"):
+            if st.button("View Details", key="details_" + key_suffix):
                 st.session_state.selected_pet = pet['id']
                 st.rerun()
         with col2:
             if not is_favorite:
-                if st.button("Add to Favorites", key=f"fav_{tab_id}_{context}_{pet['id']}"):
-                    if pet['id'] not in [p['id'] for p in st.session_state.favorites]:
-                        st.session_state.favorites.append(pet)
+                if st.button("Add to Favorites", key="fav_" + key_suffix):
+                    if pet['id'] not in fav_ids:
+                        st.session_state.favorites.append(pet['id'])
+                        fav_ids.add(pet['id'])
                         st.success(f"Added {pet['name']} to favorites!")
                         st.rerun()
             else:
-                if st.button("Remove from Favorites", key=f"unfav_{tab_id}_{context}_{pet['id']}"):
-                    st.session_state.favorites = [p for p in st.session_state.favorites if p['id'] != pet['id']]
+                if st.button("Remove from Favorites", key="unfav_" + key_suffix):
+                    st.session_state.favorites = [pid for pid in st.session_state.favorites if pid != pet['id']]
+                    fav_ids.discard(pet['id'])
                     st.success(f"Removed {pet['name']} from favorites!")
                     st.rerun()
 
+# Function to render one card as a fragment so its widgets rerun only that card
+@st.fragment
+def render_pet_card(pet, is_favorite=False, context="search", tab_id="tab1", fav_ids=None):
+    st.markdown("---")
+    display_pet_card(pet, is_favorite=is_favorite, context=context, tab_id=tab_id, fav_ids=fav_ids)
+
 # Main app with updated function calls
 def main():
+    st.markdown(_CSS_HTML, unsafe_allow_html=True)
+    
     # Title
     st.markdown("<h1 class='main-header'>🐾 PetMatch</h1>", unsafe_allow_html=True)
     st.markdown("<p class='sub-header'>Find your perfect pet companion</p>", unsafe_allow_html=True)
@@ -470,10 +654,15 @@ def main():
     # Create tabs
     tab1, tab2, tab3 = st.tabs(["Search", "Favorites", "About"])
     
+    # Read session state once per run rather than once per card
+    selected_pet = st.session_state.selected_pet
+    
     with tab1:
+        fav_ids = st.session_state.favorite_ids
+        
         # If a pet is selected, show details
-        if st.session_state.selected_pet:
-            display_pet_details(st.session_state.selected_pet, context="search", tab_id="tab1")
+        if selected_pet:
+            display_pet_details(selected_pet, context="search", tab_id="tab1")
         else:
             # Search form
             with st.expander("Search Options", expanded=True):
@@ -540,10 +729,11 @@ def main():
                             params["special_needs"] = 1
                         
                         # Perform search
-                        results = search_pets(params)
+                        results = search_pets_all(params)
                         if results and 'animals' in results:
                             st.session_state.search_results = results
                             st.session_state.page = 1
+                            st.session_state.prefetched_page = None
                             st.success(f"Found {len(results['animals'])} pets!")
                         else:
                             st.error("No pets found with those criteria. Try expanding your search.")
@@ -568,41 +758,45 @@ def main():
                 start_idx = (st.session_state.page - 1) * 10
                 end_idx = min(start_idx + 10, len(results))
                 
-                for pet in results[start_idx:end_idx]:
-                    st.markdown("---")
-                    display_pet_card(pet, tab_id="tab1")
+                page_pets = results[start_idx:end_idx]
+                
+                # Warm the details cache so "View Details" is instant
+                if st.session_state.prefetched_page != st.session_state.page:
+                    prefetch_pet_details([pet['id'] for pet in page_pets])
+                    st.session_state.prefetched_page = st.session_state.page
+                
+                for pet in page_pets:
+                    render_pet_card(pet, tab_id="tab1", fav_ids=fav_ids)
     
     with tab2:
+        fav_ids = st.session_state.favorite_ids
         st.markdown("### Your Favorite Pets")
         
         if not st.session_state.favorites:
             st.info("You haven't added any pets to your favorites yet. Start searching to find your perfect match!")
         else:
             # Check if a pet is selected from favorites
-            if st.session_state.selected_pet:
-                display_pet_details(st.session_state.selected_pet, context="favorites", tab_id="tab2")
+            if selected_pet:
+                display_pet_details(selected_pet, context="favorites", tab_id="tab2")
             else:
-                for pet in st.session_state.favorites:
-                    st.markdown("---")
-                    display_pet_card(pet, is_favorite=True, context="favorites", tab_id="tab2")
+                # Fetch any expired favorites in parallel; pets that are gone come back as None
+                favorite_pets = prefetch_pet_details(st.session_state.favorites)
+                missing = {pet_id for pet_id, pet in zip(st.session_state.favorites, favorite_pets) if pet is None}
+                if missing:
+                    st.session_state.favorites = [pid for pid in st.session_state.favorites if pid not in missing]
+                    fav_ids.difference_update(missing)
+                    st.info(f"Removed {len(missing)} pet(s) from your favorites that are no longer listed on Petfinder.")
+                errors = [pet for pet in favorite_pets if isinstance(pet, Exception)]
+                if errors:
+                    st.error(f"⚠️ Error getting pet details: {str(errors[0])}")
+                for pet in favorite_pets:
+                    if not isinstance(pet, dict):
+                        continue
+                    render_pet_card(pet, is_favorite=True, context="favorites", tab_id="tab2", fav_ids=fav_ids)
     
     with tab3:
         st.markdown("### About PetMatch")
-        st.markdown("""
-        PetMatch helps you find your perfect pet companion from thousands of adoptable animals across the country.
-        
-        **How to use PetMatch:**
-        1. Search for pets based on your preferences and location
-        2. Browse through the results and click "View Details" to learn more about each pet
-        3. Add pets to your favorites to keep track of the ones you're interested in
-        4. Contact the shelter or rescue organization directly using the provided information
-        
-        **Data Source:**
-        PetMatch uses the Petfinder API to provide up-to-date information on adoptable pets. Petfinder is North America's largest adoption website with hundreds of thousands of adoptable pets listed by more than 11,500 animal shelters and rescue organizations.
-        
-        **Privacy:**
-        PetMatch does not store any personal information or search history. Your favorites are stored locally in your browser and are not shared with any third parties.
-        """)
+        st.markdown(_ABOUT_MD)
 
 
 if __name__ == "__main__":